@@ -11,13 +11,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import hashlib
-import ipaddress
+import functools
 import json
+import sys
+
+# Translation table used to sanitise service names into resource keys.
+_DASH_TO_UNDER = str.maketrans('-', '_')
 
 
 class ResourceManagement():
 
+    # In-memory copy of the locally stored resource config, shared by
+    # the add_*/delete_* helpers so the CRM is only rebuilt from local
+    # storage once per hook rather than on every call.
+    _crm_cache = None
+    # Whether any resource config had been stored when the cache was
+    # seeded (or has been stored since); group directives are only
+    # added in that case, matching the historic behaviour.
+    _crm_seeded = False
+    # Payloads last sent by bind_on/manage_resources, letting repeat
+    # calls in the same hook skip the data_changed hashing entirely.
+    _last_bind_on = None
+    _last_manage = None
+    # Ordered set of VIP resource names, seeded from the stored
+    # resources on first use and maintained incrementally by add_vip so
+    # the group members need not be rediscovered by scanning every
+    # resource name. Kept off the CRM itself as that is serialized onto
+    # the relation.
+    _vip_members = None
+
     def data_changed(self, data_id, data, hash_type='md5'):
         raise NotImplementedError
 
@@ -60,10 +82,12 @@ class ResourceManagement():
         if mcastport:
             relation_data['corosync_mcastport'] = mcastport
 
-        if relation_data and self.data_changed('hacluster-bind_on',
-                                               relation_data):
+        if not relation_data or relation_data == self._last_bind_on:
+            return
+        if self.data_changed('hacluster-bind_on', relation_data):
             self.set_local(**relation_data)
             self.set_remote(**relation_data)
+            self._last_bind_on = relation_data
 
     def manage_resources(self, crm):
         """
@@ -85,9 +109,12 @@ class ResourceManagement():
             'json_{}'.format(k): json.dumps(v, sort_keys=True)
             for k, v in crm.items()
         }
+        if relation_data == self._last_manage:
+            return
         if self.data_changed('hacluster-manage_resources', relation_data):
             self.set_local(**relation_data)
             self.set_remote(**relation_data)
+            self._last_manage = relation_data
 
     def bind_resources(self, iface=None, mcastport=None):
         """Inform the ha subordinate about each service it should manage. The
@@ -99,20 +126,54 @@ class ResourceManagement():
         """
         if mcastport is None:
             mcastport = 4440
-        resources_dict = self.get_local('resources')
         self.bind_on(iface=iface, mcastport=mcastport)
-        if resources_dict:
-            resources = CRM(**resources_dict)
+        resources = self._fetch_resources()
+        if self._crm_seeded:
             self.manage_resources(resources)
 
+    def _fetch_resources(self):
+        """Return the locally stored resource config as a CRM instance.
+
+        The instance is cached so repeated add/delete calls within a
+        hook reuse it instead of rebuilding it from local storage.
+
+        :returns: CRM() instance - Config object for Pacemaker resources
+        """
+        resources = self._crm_cache
+        if resources is None:
+            resource_dict = self.get_local('resources')
+            if resource_dict:
+                resources = CRM(**resource_dict)
+                self._crm_seeded = True
+            else:
+                resources = CRM()
+                self._crm_seeded = False
+            self._crm_cache = resources
+        return resources
+
+    def _store_resources(self, resources):
+        """Persist the resource config, keeping the cache in sync.
+
+        :param crm: CRM() instance - Config object for Pacemaker
+                    resources
+        """
+        self._crm_cache = resources
+        self._crm_seeded = True
+        self.set_local(resources=resources)
+
+    def _invalidate_resource_cache(self):
+        """Drop the cached resource config, eg when a relation departs.
+        """
+        self._crm_cache = None
+        self._crm_seeded = False
+        self._vip_members = None
+
     def delete_resource(self, resource_name):
-        resource_dict = self.get_local('resources')
-        if resource_dict:
-            resources = CRM(**resource_dict)
-        else:
-            resources = CRM()
+        resources = self._fetch_resources()
         resources.add_delete_resource(resource_name)
-        self.set_local(resources=resources)
+        if self._vip_members is not None:
+            self._vip_members.pop(resource_name, None)
+        self._store_resources(resources)
 
     def add_vip(self, name, vip, iface=None, netmask=None):
         """Add a VirtualIP object for each user specified vip to self.resources
@@ -123,31 +184,37 @@ class ResourceManagement():
         :param netmask: string - Netmask for vip
         :returns: None
         """
-        resource_dict = self.get_local('resources')
-        if resource_dict:
-            resources = CRM(**resource_dict)
+        resources = self._fetch_resources()
+        existing = self._crm_seeded
+        vip_res = VirtualIP(
+            name,
+            vip,
+            nic=iface,
+            cidr=netmask)
+        resources.add(vip_res)
+
+        members = self._vip_members
+        live = resources['resources']
+        if members is None:
+            # Seeding after the add means VIPs stored by earlier hook
+            # invocations and the new one are both picked up.
+            members = dict.fromkeys(res for res in live if 'vip' in res)
         else:
-            resources = CRM()
-        resources.add(
-            VirtualIP(
-                name,
-                vip,
-                nic=iface,
-                cidr=netmask,))
+            members[vip_res._vip_key] = None
+            # remove_deleted_resources() purges re-added names marked
+            # for deletion earlier in the hook without telling us, so
+            # drop anything that is no longer a live resource before
+            # grouping.
+            members = dict.fromkeys(m for m in members if m in live)
+        self._vip_members = members
 
         # Vip Group
-        group = 'grp_{}_vips'.format(name)
-        vip_res_group_members = []
-        if resource_dict:
-            vip_resources = resource_dict.get('resources')
-            if vip_resources:
-                for vip_res in vip_resources:
-                    if 'vip' in vip_res:
-                        vip_res_group_members.append(vip_res)
-                resources.group(group,
-                                *sorted(vip_res_group_members))
+        if existing:
+            group = sys.intern('grp_{}_vips'.format(name))
+            resources.group(group,
+                            *sorted(members))
 
-        self.set_local(resources=resources)
+        self._store_resources(resources)
 
     def remove_vip(self, name, vip, iface=None):
         """Remove a virtual IP
@@ -159,6 +226,9 @@ class ResourceManagement():
         if iface:
             nic_name = iface
         else:
+            # Imported here rather than at module level to keep hook
+            # startup cheap on the common no-VIP path.
+            import hashlib
             nic_name = hashlib.sha1(vip.encode('UTF-8')).hexdigest()[:7]
         self.delete_resource('res_{}_{}_vip'.format(name, nic_name))
 
@@ -169,14 +239,10 @@ class ResourceManagement():
         :param service: string - Name service uses in init system
         :returns: None
         """
-        resource_dict = self.get_local('resources')
-        if resource_dict:
-            resources = CRM(**resource_dict)
-        else:
-            resources = CRM()
+        resources = self._fetch_resources()
         resources.add(
             InitService(name, service, clone))
-        self.set_local(resources=resources)
+        self._store_resources(resources)
 
     def remove_init_service(self, name, service):
         """Remove an init service
@@ -185,8 +251,8 @@ class ResourceManagement():
         :param service: string - Name of service used in init system
         """
         res_key = 'res_{}_{}'.format(
-            name.replace('-', '_'),
-            service.replace('-', '_'))
+            name.translate(_DASH_TO_UNDER),
+            service.translate(_DASH_TO_UNDER))
         self.delete_resource(res_key)
 
     def add_systemd_service(self, name, service, clone=True):
@@ -196,14 +262,10 @@ class ResourceManagement():
         :param service: string - Name service uses in systemd
         :returns: None
         """
-        resource_dict = self.get_local('resources')
-        if resource_dict:
-            resources = CRM(**resource_dict)
-        else:
-            resources = CRM()
+        resources = self._fetch_resources()
         resources.add(
             SystemdService(name, service, clone))
-        self.set_local(resources=resources)
+        self._store_resources(resources)
 
     def remove_systemd_service(self, name, service):
         """Remove a systemd service
@@ -212,8 +274,8 @@ class ResourceManagement():
         :param service: string - Name of service used in systemd
         """
         res_key = 'res_{}_{}'.format(
-            name.replace('-', '_'),
-            service.replace('-', '_'))
+            name.translate(_DASH_TO_UNDER),
+            service.translate(_DASH_TO_UNDER))
         self.delete_resource(res_key)
 
     def add_dnsha(self, name, ip, fqdn, endpoint_type):
@@ -225,27 +287,21 @@ class ResourceManagement():
         :param endpoint_type: string - Public, private, internal etc
         :returns: None
         """
-        resource_dict = self.get_local('resources')
-        if resource_dict:
-            resources = CRM(**resource_dict)
-        else:
-            resources = CRM()
+        resources = self._fetch_resources()
+        existing = self._crm_seeded
         resources.add(
             DNSEntry(name, ip, fqdn, endpoint_type))
 
         # DNS Group
-        group = 'grp_{}_hostnames'.format(name)
-        dns_res_group_members = []
-        if resource_dict:
-            dns_resources = resource_dict.get('resources')
-            if dns_resources:
-                for dns_res in dns_resources:
-                    if 'hostname' in dns_res:
-                        dns_res_group_members.append(dns_res)
-                resources.group(group,
-                                *sorted(dns_res_group_members))
+        if existing:
+            group = sys.intern('grp_{}_hostnames'.format(name))
+            dns_res_group_members = [
+                dns_res for dns_res in resources['resources']
+                if 'hostname' in dns_res]
+            resources.group(group,
+                            *sorted(dns_res_group_members))
 
-        self.set_local(resources=resources)
+        self._store_resources(resources)
 
     def remove_dnsha(self, name, endpoint_type):
         """Remove a DNS entry
@@ -255,7 +311,7 @@ class ResourceManagement():
         :returns: None
         """
         res_key = 'res_{}_{}_hostname'.format(
-            name.replace('-', '_'),
+            name.translate(_DASH_TO_UNDER),
             endpoint_type)
         self.delete_resource(res_key)
 
@@ -274,17 +330,13 @@ class ResourceManagement():
         if node_attribute:
             node_config = {
                 'node_attribute': node_attribute}
-        resource_dict = self.get_local('resources')
-        if resource_dict:
-            resources = CRM(**resource_dict)
-        else:
-            resources = CRM()
+        resources = self._fetch_resources()
         resources.colocation(
             name,
             score,
             *colo_resources,
             **node_config)
-        self.set_local(resources=resources)
+        self._store_resources(resources)
 
     def remove_colocation(self, name):
         """Remove a colocation directive
@@ -298,6 +350,44 @@ class ResourceManagement():
         raise NotImplementedError
 
 
+def _make_parser(prefix):
+    """Build a spec parser with the given prefix baked in.
+
+    :param prefix: string - Prefix to prepend to each spec fragment
+    :returns: callable accepting a str or iterable of str
+    """
+    fmt = prefix + ' %s'
+
+    def _parser(data):
+        if isinstance(data, str):
+            data = (data,)
+        if not data:
+            return ''
+        return ' ' + ' '.join(fmt % d for d in data)
+    return _parser
+
+
+# Parsers for the prefixes the CRM builders are known to use; further
+# prefixes are added lazily by CRM._parse.
+_PARSERS = {prefix: _make_parser(prefix) for prefix in (
+    'params', 'meta', 'utilization', 'operations', 'op', 'rule')}
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_cached(prefix, data):
+    """Memoized spec parsing; identical op/meta/params blocks recur
+    across many resources so the formatted output is worth caching.
+
+    :param prefix: string - Prefix to prepend to each spec fragment
+    :param data: str or tuple of str - Spec fragments
+    :returns: string
+    """
+    parser = _PARSERS.get(prefix)
+    if parser is None:
+        parser = _PARSERS.setdefault(prefix, _make_parser(prefix))
+    return parser(data)
+
+
 class CRM(dict):
     """
     Configuration object for Pacemaker resources for the HACluster
@@ -325,6 +415,10 @@ class CRM(dict):
     NEVER = NEG_INFINITY
 
     def __init__(self, *args, **kwargs):
+        # The schema is fixed so the keys are assigned directly rather
+        # than copied from a template; each instance gets fresh
+        # containers without any per-key method dispatch.
+        super(CRM, self).__init__()
         self['resources'] = {}
         self['delete_resources'] = []
         self['resource_params'] = {}
@@ -336,7 +430,11 @@ class CRM(dict):
         self['locations'] = {}
         self['init_services'] = []
         self['systemd_services'] = []
-        super(CRM, self).__init__(*args, **kwargs)
+        if args or kwargs:
+            self.update(*args, **kwargs)
+        # Insertion-ordered set mirroring 'delete_resources', giving
+        # add_delete_resource O(1) membership checks.
+        self._delete_seen = dict.fromkeys(self['delete_resources'])
 
     def primitive(self, name, agent, description=None, **kwargs):
         """Configures a primitive resource within Pacemaker.
@@ -399,32 +497,30 @@ class CRM(dict):
         resources = self['resources']
         resources[name] = agent
 
-        specs = ''
+        specs = []
         if description:
-            specs = specs + 'description="%s"' % description
+            specs.append('description="%s"' % description)
 
         # Use the ordering specified in the crm manual
-        for key in 'params', 'meta', 'utilization', 'operations', 'op':
-            if key not in kwargs:
-                continue
-            specs = specs + (' %s' % self._parse(key, kwargs[key]))
+        if (value := kwargs.get('params')) is not None:
+            specs.append(' %s' % self._parse('params', value))
+        if (value := kwargs.get('meta')) is not None:
+            specs.append(' %s' % self._parse('meta', value))
+        if (value := kwargs.get('utilization')) is not None:
+            specs.append(' %s' % self._parse('utilization', value))
+        if (value := kwargs.get('operations')) is not None:
+            specs.append(' %s' % self._parse('operations', value))
+        if (value := kwargs.get('op')) is not None:
+            specs.append(' %s' % self._parse('op', value))
 
         if specs:
-            self['resource_params'][name] = specs
+            self['resource_params'][name] = ''.join(specs)
 
     def _parse(self, prefix, data):
-        results = ''
-        if isinstance(data, str):
-            data = [data]
-
-        first = True
-        for d in data:
-            if first:
-                results = results + ' '
-                first = False
-            results = results + ('%s %s ' % (prefix, d))
-        results = results.rstrip()
-        return results
+        if not isinstance(data, str):
+            # Normalise to a hashable type for the cache.
+            data = tuple(data)
+        return _parse_cached(prefix, data)
 
     def clone(self, name, resource, description=None, **kwargs):
         """Creates a resource which should run on all nodes.
@@ -450,19 +546,16 @@ class CRM(dict):
         --------
         http://crmsh.github.io/man/#cmdhelp_configure_clone
         """
-        clone_specs = resource
+        clone_specs = [resource]
         if description:
-            clone_specs = clone_specs + (' description="%s"' % description)
+            clone_specs.append(' description="%s"' % description)
 
-        for key in 'meta', 'params':
-            if key not in kwargs:
-                continue
-            value = kwargs[key]
-            if not value:
-                continue
-            clone_specs = clone_specs + (' %s' % self._parse(key, value))
+        if (value := kwargs.get('meta')):
+            clone_specs.append(' %s' % self._parse('meta', value))
+        if (value := kwargs.get('params')):
+            clone_specs.append(' %s' % self._parse('params', value))
 
-        self['clones'][name] = clone_specs
+        self['clones'][name] = ''.join(clone_specs)
 
     def colocation(self, name, score=ALWAYS, *resources, **kwargs):
         """Configures the colocation constraints of resources.
@@ -519,8 +612,8 @@ class CRM(dict):
         http://crmsh.github.io/man/#cmdhelp_configure_colocation
         """
         specs = '%s: %s' % (score, ' '.join(resources))
-        if 'node_attribute' in kwargs:
-            specs = specs + (' node-attribute=%s' % kwargs['node_attribute'])
+        if (node_attribute := kwargs.get('node_attribute')) is not None:
+            specs = specs + (' node-attribute=%s' % node_attribute)
         self['colocations'][name] = specs
 
     def group(self, name, *resources, **kwargs):
@@ -556,17 +649,16 @@ class CRM(dict):
         --------
         http://crmsh.github.io/man/#cmdhelp_configure_group
         """
-        specs = ' '.join(resources)
-        if 'description' in kwargs:
-            specs = specs + (' description=%s"' % kwargs['description'])
+        specs = [' '.join(resources)]
+        if (description := kwargs.get('description')) is not None:
+            specs.append(f' description="{description}"')
 
-        for key in 'meta', 'params':
-            if key not in kwargs:
-                continue
-            value = kwargs[key]
-            specs = specs + (' %s' % self._parse(key, value))
+        if (value := kwargs.get('meta')) is not None:
+            specs.append(' %s' % self._parse('meta', value))
+        if (value := kwargs.get('params')) is not None:
+            specs.append(' %s' % self._parse('params', value))
 
-        self['groups'][name] = specs
+        self['groups'][name] = ''.join(specs)
 
     def remove_deleted_resources(self):
         """Work through the existing resources and remove any mention of ones
@@ -601,6 +693,7 @@ class CRM(dict):
         http://crmsh.github.io/man/#cmdhelp_configure_delete
         """
         self['delete_resources'] = resources
+        self._delete_seen = dict.fromkeys(resources)
         self.remove_deleted_resources()
 
     def add_delete_resource(self, resource):
@@ -621,12 +714,11 @@ class CRM(dict):
         --------
         http://crmsh.github.io/man/#cmdhelp_configure_delete
         """
-        if resource not in self['delete_resources']:
-            # NOTE(fnordahl): this unpleasant piece of code is regrettably
-            # necessary for Python3.4 (and trusty) compability see LP: #1814218
-            # and LP: #1813982
-            self['delete_resources'] = tuple(
-                self['delete_resources'] or ()) + (resource,)
+        if resource not in self._delete_seen:
+            self._delete_seen[resource] = None
+            # Charms expect a tuple on the wire (LP: #1814218,
+            # LP: #1813982) so materialise one from the ordered set.
+            self['delete_resources'] = tuple(self._delete_seen)
             self.remove_deleted_resources()
 
     def init_services(self, *resources):
@@ -694,17 +786,16 @@ class CRM(dict):
         --------
         http://crmsh.github.io/man/#cmdhelp_configure_ms
         """
-        specs = resource
+        specs = [resource]
         if description:
-            specs = specs + (' description="%s"' % description)
+            specs.append(' description="%s"' % description)
 
-        for key in 'meta', 'params':
-            if key not in kwargs:
-                continue
-            value = kwargs[key]
-            specs = specs + (' %s' % self._parse(key, value))
+        if (value := kwargs.get('meta')) is not None:
+            specs.append(' %s' % self._parse('meta', value))
+        if (value := kwargs.get('params')) is not None:
+            specs.append(' %s' % self._parse('params', value))
 
-        self['ms'][name] = specs
+        self['ms'][name] = ''.join(specs)
 
     def location(self, name, resource, **kwargs):
         """Defines the preference of nodes for the given resource.
@@ -733,21 +824,19 @@ class CRM(dict):
         --------
         http://crmsh.github.io/man/#cmdhelp_configure_location
         """
-        specs = resource
+        specs = [resource]
 
         # Check if there are attributes assigned to the location and if so,
         # format the spec string with the attributes
-        if 'attributes' in kwargs:
-            attrs = kwargs['attributes']
+        if (attrs := kwargs.get('attributes')) is not None:
             if isinstance(attrs, str):
                 attrs = [attrs]
-            specs = specs + (' %s' % ' '.join(attrs))
+            specs.append(' %s' % ' '.join(attrs))
 
-        if 'rule' in kwargs:
-            rules = kwargs['rule']
-            specs = specs + (' %s' % self._parse('rule', rules))
+        if (rules := kwargs.get('rule')) is not None:
+            specs.append(' %s' % self._parse('rule', rules))
 
-        self['locations'][name] = specs
+        self['locations'][name] = ''.join(specs)
 
     def order(self, name, score=None, *resources, **kwargs):
         """Configures the ordering constraints of resources.
@@ -799,15 +888,15 @@ class CRM(dict):
         --------
         http://crmsh.github.io/man/#cmdhelp_configure_order
         """
-        specs = ''
+        specs = []
         if score:
-            specs = '%s:' % score
+            specs.append('%s:' % score)
 
-        specs = specs + (' %s' % ' '.join(resources))
-        if 'symmetrical' in kwargs:
-            specs = specs + (' symmetrical=' % kwargs['symmetrical'])
+        specs.append(' %s' % ' '.join(resources))
+        if (symmetrical := kwargs.get('symmetrical')) is not None:
+            specs.append(f' symmetrical={symmetrical}')
 
-        self['orders'][name] = specs
+        self['orders'][name] = ''.join(specs)
 
     def add(self, resource_desc):
         """Adds a resource descriptor object to the CRM configuration.
@@ -870,6 +959,15 @@ class InitService(ResourceDescriptor):
         self.service_name = service_name
         self.init_service_name = init_service_name
         self.clone = clone
+        # The derived names are immutable after construction so compute
+        # them once here rather than on every configure_resource call.
+        # The names recur as keys across the CRM sub-dicts so intern
+        # them to share storage and speed up the key lookups.
+        self._res_key = sys.intern('res_{}_{}'.format(
+            service_name.translate(_DASH_TO_UNDER),
+            init_service_name.translate(_DASH_TO_UNDER)))
+        self._res_type = 'lsb:{}'.format(init_service_name)
+        self._clone_key = sys.intern('cl_{}'.format(self._res_key))
 
     def configure_resource(self, crm):
         """"Configure new init system service resource in crm
@@ -877,17 +975,13 @@ class InitService(ResourceDescriptor):
         :param crm: CRM() instance - Config object for Pacemaker resources
         :returns: None
         """
-        res_key = 'res_{}_{}'.format(
-            self.service_name.replace('-', '_'),
-            self.init_service_name.replace('-', '_'))
-        res_type = 'lsb:{}'.format(self.init_service_name)
         _meta = 'migration-threshold="INFINITY" failure-timeout="5s"'
         crm.primitive(
-            res_key, res_type, op='monitor interval="5s"', meta=_meta)
+            self._res_key, self._res_type,
+            op='monitor interval="5s"', meta=_meta)
         crm.init_services(self.init_service_name)
         if self.clone:
-            clone_key = 'cl_{}'.format(res_key)
-            crm.clone(clone_key, res_key)
+            crm.clone(self._clone_key, self._res_key)
 
 
 class VirtualIP(ResourceDescriptor):
@@ -904,6 +998,24 @@ class VirtualIP(ResourceDescriptor):
         self.vip = vip
         self.nic = nic
         self.cidr = cidr
+        # Parse the address once at construction time rather than on
+        # every configure_resource call. ipaddress is only needed when
+        # a VIP is actually configured so it is imported lazily.
+        import ipaddress
+        self._is_ipv6 = isinstance(
+            ipaddress.ip_address(vip), ipaddress.IPv6Address)
+        # The resource name depends only on the constructor arguments,
+        # so derive it (hashing the vip when no nic is given) once here
+        # instead of on every configure_resource call.
+        if self._is_ipv6:
+            self._vip_key = sys.intern(
+                f'res_{service_name}_{nic}_ipv6addr_vip')
+        elif nic:
+            self._vip_key = sys.intern(f'res_{service_name}_{nic}_vip')
+        else:
+            import hashlib
+            vip_hash = hashlib.sha1(vip.encode('UTF-8')).hexdigest()[:7]
+            self._vip_key = sys.intern(f'res_{service_name}_{vip_hash}_vip')
 
     def configure_resource(self, crm):
         """Configure new vip resource in crm
@@ -911,27 +1023,18 @@ class VirtualIP(ResourceDescriptor):
         :param crm: CRM() instance - Config object for Pacemaker resources
         :returns: None
         """
-        if self.nic:
-            vip_key = 'res_{}_{}_vip'.format(self.service_name, self.nic)
+        vip_key = self._vip_key
+        if self._is_ipv6:
+            res_type = 'ocf:heartbeat:IPv6addr'
+            res_params = f'ipv6addr="{self.vip}"'
         else:
-            vip_key = 'res_{}_{}_vip'.format(
-                self.service_name,
-                hashlib.sha1(self.vip.encode('UTF-8')).hexdigest()[:7])
-        ipaddr = ipaddress.ip_address(self.vip)
-        if isinstance(ipaddr, ipaddress.IPv4Address):
             res_type = 'ocf:heartbeat:IPaddr2'
-            res_params = 'ip="{}"'.format(self.vip)
-        else:
-            res_type = 'ocf:heartbeat:IPv6addr'
-            res_params = 'ipv6addr="{}"'.format(self.vip)
-            vip_params = 'ipv6addr'
-            vip_key = 'res_{}_{}_{}_vip'.format(self.service_name, self.nic,
-                                                vip_params)
+            res_params = f'ip="{self.vip}"'
 
         if self.nic:
-            res_params = '{} nic="{}"'.format(res_params, self.nic)
+            res_params = f'{res_params} nic="{self.nic}"'
         if self.cidr:
-            res_params = '{} cidr_netmask="{}"'.format(res_params, self.cidr)
+            res_params = f'{res_params} cidr_netmask="{self.cidr}"'
         # Monitor the VIP
         _op_monitor = 'monitor timeout="20s" interval="10s" depth="0"'
         _meta = 'migration-threshold="INFINITY" failure-timeout="5s"'
@@ -964,9 +1067,9 @@ class DNSEntry(ResourceDescriptor):
                                   agent to use for DNS HA
         :returns: None
         """
-        res_key = 'res_{}_{}_hostname'.format(
-            self.service_name.replace('-', '_'),
-            self.endpoint_type)
+        res_key = sys.intern('res_{}_{}_hostname'.format(
+            self.service_name.translate(_DASH_TO_UNDER),
+            self.endpoint_type))
         res_params = ''
         if self.fqdn:
             res_params = '{} fqdn="{}"'.format(res_params, self.fqdn)
@@ -988,6 +1091,13 @@ class SystemdService(ResourceDescriptor):
         self.service_name = service_name
         self.systemd_service_name = systemd_service_name
         self.clone = clone
+        # As for InitService, the derived names never change so they are
+        # computed up front.
+        self._res_key = sys.intern('res_{}_{}'.format(
+            service_name.translate(_DASH_TO_UNDER),
+            systemd_service_name.translate(_DASH_TO_UNDER)))
+        self._res_type = 'systemd:{}'.format(systemd_service_name)
+        self._clone_key = sys.intern('cl_{}'.format(self._res_key))
 
     def configure_resource(self, crm):
         """"Configure new systemd system service resource in crm
@@ -995,17 +1105,14 @@ class SystemdService(ResourceDescriptor):
         :param crm: CRM() instance - Config object for Pacemaker resources
         :returns: None
         """
-        res_key = 'res_{}_{}'.format(
-            self.service_name.replace('-', '_'),
-            self.systemd_service_name.replace('-', '_'))
-        res_type = 'systemd:{}'.format(self.systemd_service_name)
+        res_key = self._res_key
+        res_type = self._res_type
         _meta = 'migration-threshold="INFINITY" failure-timeout="5s"'
 
         if self.clone:
             crm.primitive(res_key, res_type, op='monitor interval="5s"',
                           meta=_meta)
-            clone_key = 'cl_{}'.format(res_key)
-            crm.clone(clone_key, res_key)
+            crm.clone(self._clone_key, res_key)
         else:
             # When the requested resource is not a clone will mean we want it
             # to run in a single node, so having 2 monitors allows pacemaker
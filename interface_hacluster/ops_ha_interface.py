@@ -12,10 +12,16 @@
 # Copyright 2021 Ubuntu
 # See LICENSE file for licensing details.
 
-import hashlib
 import json
 import interface_hacluster.common as common
 
+try:
+    # Optional: a much faster non-cryptographic hash for change
+    # detection when available.
+    import xxhash
+except ImportError:
+    xxhash = None
+
 from ops.framework import (
     StoredState,
     EventBase,
@@ -37,20 +43,63 @@ class HAServiceRequires(Object, common.ResourceManagement):
     on = HAServiceEvents()
     _stored = StoredState()
 
+    # Cache of hashlib constructors used by data_changed so the
+    # getattr lookup only happens once per algorithm.
+    _ALGS = {}
+
     def __init__(self, charm, relation_name):
         super().__init__(charm, relation_name)
         self.relation_name = relation_name
         self.framework.observe(
             charm.on[self.relation_name].relation_changed,
             self._on_relation_changed)
+        self.framework.observe(
+            charm.on[self.relation_name].relation_departed,
+            self._on_relation_departed)
         self._stored.set_default(
-            resources={})
+            local_data='{}')
+        # Parsed copy of the stored local data, decoded at most once per
+        # hook invocation.
+        self._local_data = None
+        # Map of data_id -> (data, hash) used by data_changed to skip
+        # re-serializing a payload object it has already seen.
+        self._data_changed_cache = {}
+        # Inverted key -> values index over all remote unit databags,
+        # built lazily by get_remote_all and dropped whenever relation
+        # membership or data changes.
+        self._remote_index = None
+
+    def _local_blob(self):
+        if self._local_data is None:
+            blob = json.loads(self._stored.local_data)
+            self._migrate_legacy_local_data(blob)
+            self._local_data = blob
+        return self._local_data
+
+    def _migrate_legacy_local_data(self, blob):
+        """Fold pre-blob 'local-data.<key>' entries into the blob.
+
+        Earlier versions stored one JSON-encoded StoredState attribute
+        per key. On upgrade those entries are folded into the blob once
+        and removed, so resource config and data_changed baselines
+        survive the switch to the single-blob layout.
+        """
+        # StoredState offers no public way to enumerate or delete keys,
+        # so reach through to the underlying StoredStateData snapshot.
+        snapshot = self._stored._data.snapshot()
+        legacy = [k for k in snapshot if k.startswith('local-data.')]
+        if not legacy:
+            return
+        for key in legacy:
+            value = snapshot.pop(key)
+            if value:
+                blob.setdefault(key[len('local-data.'):], json.loads(value))
+        self._stored.local_data = json.dumps(blob)
 
     def get_local(self, key, default=None):
-        key = '%s.%s' % ('local-data', key)
-        json_value = getattr(self._stored, key, None)
-        if json_value:
-            return json.loads(json_value)
+        value = self._local_blob().get(key)
+        if value is not None:
+            return value
         if default:
             return default
         return None
@@ -63,16 +112,20 @@ class HAServiceRequires(Object, common.ResourceManagement):
         data.update(kwdata)
         if not data:
             return
-        for k, v in data.items():
-            setattr(
-                self._stored,
-                'local-data.{}'.format(k),
-                json.dumps(v))
+        # All local data lives in a single JSON blob so a bulk update
+        # costs one StoredState write rather than one per key.
+        blob = self._local_blob()
+        blob.update(data)
+        self._stored.local_data = json.dumps(blob)
 
     def _on_relation_changed(self, event):
+        self._remote_index = None
         if self.is_clustered():
             self.on.ha_ready.emit()
 
+    def _on_relation_departed(self, event):
+        self._remote_index = None
+
     def data_changed(self, data_id, data, hash_type='md5'):
         """Check if the given set of data has changed since the previous call.
 
@@ -88,12 +141,31 @@ class HAServiceRequires(Object, common.ResourceManagement):
         :param data: JSON-serializable data.
         :param str hash_type: Any hash algorithm supported by :mod:`hashlib`.
         """
+        cached = self._data_changed_cache.get(data_id)
+        if cached is not None and cached[0] is data:
+            # The exact same object was checked earlier in this hook and
+            # its hash recorded, so there is nothing new to report.
+            return False
         key = 'data_changed.%s' % data_id
-        alg = getattr(hashlib, hash_type)
-        serialized = json.dumps(data, sort_keys=True).encode('utf8')
+        serialized = json.dumps(
+            data, sort_keys=True, separators=(',', ':')).encode('utf8')
         old_hash = self.get_local(key)
-        new_hash = alg(serialized).hexdigest()
+        if hash_type == 'md5' and xxhash is not None:
+            # The hash is only compared against the previously stored
+            # one, so the default can use the faster xxh3 when the
+            # optional xxhash package is installed.
+            new_hash = xxhash.xxh3_64(serialized).hexdigest()
+        else:
+            alg = self._ALGS.get(hash_type)
+            if alg is None:
+                # hashlib is only needed on this fallback path so defer
+                # the import until it is first used.
+                import hashlib
+                alg = self._ALGS.setdefault(hash_type, getattr(hashlib,
+                                                               hash_type))
+            new_hash = alg(serialized).hexdigest()
         self.set_local(key, new_hash)
+        self._data_changed_cache[data_id] = (data, new_hash)
         return old_hash != new_hash
 
     def set_remote(self, key=None, value=None, data=None, **kwdata):
@@ -104,20 +176,31 @@ class HAServiceRequires(Object, common.ResourceManagement):
         data.update(kwdata)
         if not data:
             return
+        # The reactive framework copes with integer values but the ops
+        # framework insists on strings so convert them, once, before
+        # writing to any relation.
+        data = {
+            k: str(v) if isinstance(v, int) else v
+            for k, v in data.items()}
+        local_unit = self.model.unit
         for relation in self.framework.model.relations[self.relation_name]:
-            for k, v in data.items():
-                # The reactive framework copes with integer values but the ops
-                # framework insists on strings so convert them.
-                if isinstance(v, int):
-                    v = str(v)
-                relation.data[self.model.unit][k] = v
+            relation.data[local_unit].update(data)
 
     def get_remote_all(self, key, default=None):
         """Return a list of all values presented by remote units for key"""
-        values = []
-        for relation in self.framework.model.relations[self.relation_name]:
-            for unit in relation.units:
-                value = relation.data[unit].get(key)
-                if value:
-                    values.append(value)
-        return list(set(values))
+        index = self._remote_index
+        if index is None:
+            # One pass over every unit databag builds an inverted
+            # key -> ordered set of values index; later lookups for any
+            # key are then a dict access. Dicts are used as ordered
+            # sets so deduplication is O(1) and ordering deterministic.
+            index = {}
+            relations = self.framework.model.relations[self.relation_name]
+            for relation in relations:
+                data = relation.data
+                for unit in relation.units:
+                    for k, v in data[unit].items():
+                        if v:
+                            index.setdefault(k, {})[v] = None
+            self._remote_index = index
+        return list(index.get(key, ()))
@@ -40,6 +40,7 @@ class HAClusterRequires(RelationBase, common.ResourceManagement):
     def departed(self):
         self.remove_state('{relation_name}.available')
         self.remove_state('{relation_name}.connected')
+        self._invalidate_resource_cache()
 
     def data_changed(self, data_id, data, hash_type='md5'):
         return rh_data_changed(data_id, data, hash_type)
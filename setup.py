@@ -35,4 +35,7 @@ setup(
     packages=find_packages(exclude=["unit_tests"]),
     zip_safe=False,
     install_requires=install_require,
+    extras_require={
+        'fast-hash': ['xxhash'],
+    },
 )
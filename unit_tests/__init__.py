@@ -1,12 +1,11 @@
 # Patch out lsb_release() and get_platform() as unit tests should be fully
 # insulated from the underlying platform.  Unit tests assume that the system is
-# ubuntu jammy.
-from unittest.mock import patch
-patch(
-    'charmhelpers.osplatform.get_platform', return_value='ubuntu'
-).start()
-patch(
-    'charmhelpers.core.host.lsb_release',
-    return_value={
-        'DISTRIB_CODENAME': 'jammy'
-    }).start()
+# ubuntu jammy.  Plain function assignment is used rather than mock.patch as
+# the replacements stay in place for the whole test run and avoid the
+# MagicMock call machinery on these hot helpers.
+import charmhelpers.osplatform
+charmhelpers.osplatform.get_platform = lambda: 'ubuntu'
+# charmhelpers.core.host calls get_platform() at import time, so it must only
+# be imported after the patch above is in place.
+import charmhelpers.core.host
+charmhelpers.core.host.lsb_release = lambda: {'DISTRIB_CODENAME': 'jammy'}
@@ -18,8 +18,13 @@ import interface_hacluster.common as common
 
 class TestHAClusterCommonCRM(unittest.TestCase):
 
+    def setUp(self):
+        # Every test works on a fresh CRM, so build it once per test
+        # here instead of repeating the construction in each method.
+        self.crm = common.CRM()
+
     def test_init(self):
-        crm = common.CRM()
+        crm = self.crm
         expect = {
             'resources': {},
             'delete_resources': [],
@@ -46,7 +51,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
             expect)
 
     def test_primitive(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.primitive('www8', 'apache',
                       params='configfile=/etc/apache/www8.conf',
                       operations='$id-ref=apache_ops')
@@ -59,7 +64,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
              'operations $id-ref=apache_ops'))
 
     def test_primitive_description(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.primitive('www8', 'apache',
                       description='super awesome',
                       params='configfile=/etc/apache/www8.conf',
@@ -74,7 +79,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
              'operations $id-ref=apache_ops'))
 
     def test_primitive_multiops(self):
-        crm = common.CRM()
+        crm = self.crm
         ops = ['monitor role=Master interval=60s',
                'monitor role=Slave interval=300s']
 
@@ -90,7 +95,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
              'interval=60s op monitor role=Slave interval=300s'))
 
     def test__parse(self):
-        crm = common.CRM()
+        crm = self.crm
         self.assertEqual(
             crm._parse('prefix', 'var1'),
             ' prefix var1')
@@ -102,7 +107,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
             ' prefix var1 prefix var2')
 
     def test_clone(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.clone(
             'cl_nova_haproxy',
             'res_neutron_haproxy',
@@ -112,7 +117,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
             'res_neutron_haproxy description="FE Haproxy"')
 
     def test_clone_meta(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.clone(
             'cl_nova_haproxy',
             'res_neutron_haproxy',
@@ -124,14 +129,14 @@ class TestHAClusterCommonCRM(unittest.TestCase):
              'meta clone-node-max=1'))
 
     def test_colocation(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.colocation('console_with_vip', 'ALWAYS', 'nova-console', 'vip')
         self.assertEqual(
             crm['colocations']['console_with_vip'],
             'ALWAYS: nova-console vip')
 
     def test_colocation_node_attr(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.colocation(
             'console_with_vip',
             'ALWAYS',
@@ -143,7 +148,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
             'ALWAYS: nova-console vip node-attribute=attr1')
 
     def test_group(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.group('grp_mysql', 'res_mysql_rbd', 'res_mysql_fs',
                   'res_mysql_vip', 'res_mysqld')
         self.assertEqual(
@@ -151,7 +156,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
             'res_mysql_rbd res_mysql_fs res_mysql_vip res_mysqld')
 
     def test_group_meta(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.group('grp_mysql', 'res_mysql_rbd', 'res_mysql_fs',
                   'res_mysql_vip', 'res_mysqld', meta='container="vm"')
         self.assertEqual(
@@ -160,7 +165,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
              'meta container="vm"'))
 
     def test_group_meta_and_params(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.group('grp_mysql', 'res_mysql_rbd', 'res_mysql_fs',
                   'res_mysql_vip', 'res_mysqld', meta='container="vm"',
                   params='config=/etc/mysql/db0.conf')
@@ -171,35 +176,35 @@ class TestHAClusterCommonCRM(unittest.TestCase):
              'params config=/etc/mysql/db0.conf'))
 
     def test_group_desc(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.group('grp_mysql', 'res_mysql_rbd', 'res_mysql_fs',
                   'res_mysql_vip', 'res_mysqld', description='useful desc')
         self.assertEqual(
             crm['groups']['grp_mysql'],
             ('res_mysql_rbd res_mysql_fs res_mysql_vip res_mysqld '
-             'description=useful desc"'))
+             'description="useful desc"'))
 
     def test_delete_resource(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.delete_resource('res_mysql_vip')
         self.assertEqual(
             crm['delete_resources'],
             ('res_mysql_vip',))
 
     def test_delete_resource_multi(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.delete_resource('res_mysql_vip', 'grp_mysql')
         self.assertEqual(
             crm['delete_resources'],
             ('res_mysql_vip', 'grp_mysql'))
 
     def test_add_delete_resource(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.add_delete_resource('res_mysql_vip')
         self.assertEqual(crm['delete_resources'], ('res_mysql_vip',))
 
     def test_add_delete_resource_multi(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.add_delete_resource('res_mysql_vip')
         crm.add_delete_resource('grp_mysql')
         self.assertEqual(
@@ -207,7 +212,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
             ('res_mysql_vip', 'grp_mysql'))
 
     def test_add_delete_resource_mix(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.delete_resource('grp_mysql')
         crm.add_delete_resource('res_mysql_vip')
         self.assertEqual(
@@ -215,7 +220,7 @@ class TestHAClusterCommonCRM(unittest.TestCase):
             ('grp_mysql', 'res_mysql_vip'))
 
     def test_add_delete_resource_dupe(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.add_delete_resource('res_mysql_vip')
         crm.add_delete_resource('res_mysql_vip')
         self.assertEqual(
@@ -223,28 +228,28 @@ class TestHAClusterCommonCRM(unittest.TestCase):
             ('res_mysql_vip',))
 
     def test_init_services(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.init_services('haproxy')
         self.assertEqual(
             crm['init_services'],
             ('haproxy',))
 
     def test_init_services_multi(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.init_services('haproxy', 'apache2')
         self.assertEqual(
             crm['init_services'],
             ('haproxy', 'apache2'))
 
     def test_ms_meta(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.ms('disk1', 'drbd1', meta='notify=true globally-unique=false')
         self.assertEqual(
             crm['ms']['disk1'],
             'drbd1  meta notify=true globally-unique=false')
 
     def test_ms_meta_and_params(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.ms('disk1', 'drbd1',
                meta='notify=true globally-unique=false',
                params='config=/etc/mysql/db0.conf')
@@ -254,31 +259,43 @@ class TestHAClusterCommonCRM(unittest.TestCase):
             'params config=/etc/mysql/db0.conf')
 
     def test_ms_desc(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.ms('disk1', 'drbd1', description='useful desc')
         self.assertEqual(
             crm['ms']['disk1'],
             'drbd1 description="useful desc"')
 
     def test_systemd_services(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.systemd_services('haproxy')
         self.assertEqual(
             crm['systemd_services'],
             ('haproxy',))
 
     def test_systemd_services_multi(self):
-        crm = common.CRM()
+        crm = self.crm
         crm.systemd_services('haproxy', 'apache2')
         self.assertEqual(
             crm['systemd_services'],
             ('haproxy', 'apache2'))
 
-    # The method signature of 'order' seems broken. Leaving out unit tests for
-    # it as they would just confirm broken behaviour.
+    def test_order(self):
+        crm = self.crm
+        crm.order('apache-after-ip', 'Mandatory', 'ClusterIP', 'apache')
+        self.assertEqual(
+            crm['orders']['apache-after-ip'],
+            'Mandatory: ClusterIP apache')
+
+    def test_order_symmetrical(self):
+        crm = self.crm
+        crm.order('apache-after-ip', 'Mandatory', 'ClusterIP', 'apache',
+                  symmetrical=False)
+        self.assertEqual(
+            crm['orders']['apache-after-ip'],
+            'Mandatory: ClusterIP apache symmetrical=False')
 
     def test_add(self):
-        crm = common.CRM()
+        crm = self.crm
         mock1 = mock.MagicMock()
         mock2 = mock.MagicMock()
         mock1.configure_resource = mock2
@@ -14,6 +14,7 @@
 # Copyright 2021 Ubuntu
 # See LICENSE file for licensing details.
 
+import json
 import unittest
 import sys
 sys.path.append('.')  # noqa
@@ -72,6 +73,21 @@ requires:
             self.harness.charm.ha.get_local('i'),
             'j')
 
+    def test_local_vars_legacy_migration(self):
+        self.harness.begin()
+        ha = self.harness.charm.ha
+        # Simulate state written by the old per-key StoredState layout.
+        setattr(ha._stored, 'local-data.resources',
+                json.dumps({'res_a': 'lsb:a'}))
+        self.assertEqual(
+            ha.get_local('resources'),
+            {'res_a': 'lsb:a'})
+        # The legacy key is gone and the value now lives in the blob.
+        self.assertNotIn('local-data.resources', ha._stored._data)
+        self.assertEqual(
+            json.loads(ha._stored.local_data)['resources'],
+            {'res_a': 'lsb:a'})
+
     def test_remote_vars(self):
         self.harness.begin()
         rel_id = self.harness.add_relation(
@@ -88,40 +104,43 @@ requires:
 
     def test_get_remote_all(self):
         self.harness.begin()
-        rel_id1 = self.harness.add_relation(
-            'ha',
-            'hacluster-a')
-        self.harness.add_relation_unit(
-            rel_id1,
-            'hacluster-a/0')
-        self.harness.update_relation_data(
-            rel_id1,
-            'hacluster-a/0',
-            {'fruit': 'banana'})
-        self.harness.add_relation_unit(
-            rel_id1,
-            'hacluster-a/1')
-        self.harness.update_relation_data(
-            rel_id1,
-            'hacluster-a/1',
-            {'fruit': 'orange'})
-        rel_id2 = self.harness.add_relation(
-            'ha',
-            'hacluster-b')
-        self.harness.add_relation_unit(
-            rel_id2,
-            'hacluster-b/0')
-        self.harness.update_relation_data(
-            rel_id2,
-            'hacluster-b/0',
-            {'fruit': 'grape'})
-        self.harness.add_relation_unit(
-            rel_id2,
-            'hacluster-b/1')
-        self.harness.update_relation_data(
-            rel_id2,
-            'hacluster-b/1',
-            {'veg': 'carrot'})
+        # The observers are not under test here, so skip event dispatch
+        # while the relations are being populated.
+        with self.harness.hooks_disabled():
+            rel_id1 = self.harness.add_relation(
+                'ha',
+                'hacluster-a')
+            self.harness.add_relation_unit(
+                rel_id1,
+                'hacluster-a/0')
+            self.harness.update_relation_data(
+                rel_id1,
+                'hacluster-a/0',
+                {'fruit': 'banana'})
+            self.harness.add_relation_unit(
+                rel_id1,
+                'hacluster-a/1')
+            self.harness.update_relation_data(
+                rel_id1,
+                'hacluster-a/1',
+                {'fruit': 'orange'})
+            rel_id2 = self.harness.add_relation(
+                'ha',
+                'hacluster-b')
+            self.harness.add_relation_unit(
+                rel_id2,
+                'hacluster-b/0')
+            self.harness.update_relation_data(
+                rel_id2,
+                'hacluster-b/0',
+                {'fruit': 'grape'})
+            self.harness.add_relation_unit(
+                rel_id2,
+                'hacluster-b/1')
+            self.harness.update_relation_data(
+                rel_id2,
+                'hacluster-b/1',
+                {'veg': 'carrot'})
         self.assertEqual(
             # sort for comparison because order is not guaranteed
             sorted(self.harness.charm.ha.get_remote_all('fruit')),
@@ -157,3 +176,15 @@ requires:
         self.assertTrue(
             self.harness.charm.ha.data_changed(
                 'relation-data', {'a': 'c'}))
+
+    @unittest.skipIf(ops_ha_interface.xxhash is None, 'xxhash not installed')
+    def test_data_changed_xxhash(self):
+        self.harness.begin()
+        ha = self.harness.charm.ha
+        self.assertTrue(ha.data_changed('relation-data', {'a': 'b'}))
+        serialized = json.dumps(
+            {'a': 'b'}, sort_keys=True, separators=(',', ':')).encode('utf8')
+        # The default hash type must have gone through xxh3.
+        self.assertEqual(
+            ha.get_local('data_changed.relation-data'),
+            ops_ha_interface.xxhash.xxh3_64(serialized).hexdigest())
@@ -11,44 +11,63 @@
 # limitations under the License.
 
 
+import copy
 import json
+import sys
+import types
 from unittest import mock
 import unittest
 
 import interface_hacluster.common as common
 
 # Deal with the 'relations.hacluster.common' import in requires.py which
-# is invalid in the unit tests as there is no 'relations'.
-relations_mock = mock.MagicMock()
-relations_mock.hacluster.interface_hacluster.common = common
-modules = {
-    'relations': relations_mock,
-    'relations.hacluster': mock.MagicMock(),
-    'relations.hacluster.interface_hacluster': mock.MagicMock(),
-    'relations.hacluster.interface_hacluster.common': common,
-}
-module_patcher = mock.patch.dict('sys.modules', modules)
-module_patcher.start()
+# is invalid in the unit tests as there is no 'relations'.  The patch
+# must be in place before requires is imported, so it lives here rather
+# than in a fixture; the guard keeps it from being installed twice if
+# another test module imports this one.
+if 'relations' not in sys.modules:
+    relations_mock = mock.Mock()
+    relations_mock.hacluster.interface_hacluster.common = common
+    modules = {
+        'relations': relations_mock,
+        'relations.hacluster': mock.Mock(),
+        'relations.hacluster.interface_hacluster': mock.Mock(),
+        'relations.hacluster.interface_hacluster.common': common,
+    }
+    module_patcher = mock.patch.dict('sys.modules', modules)
+    module_patcher.start()
 
 with mock.patch('charmhelpers.core.hookenv.metadata') as _meta:
     _meta.return_Value = 'ss'
     import requires
 
-_hook_args = {}
+# Sentinel marking attributes that did not exist on the instance before
+# patch_kr replaced them.
+_MISSING = object()
 
-TO_PATCH = [
-    'rh_data_changed',
-]
+# The CRM sections that stay empty in most of the expected/preseed
+# dicts below; spread into each with {**_EMPTY_SKELETON, ...}. The
+# proxy keeps the shared template itself read-only.
+_EMPTY_SKELETON = types.MappingProxyType({
+    'groups': {},
+    'ms': {},
+    'orders': {},
+    'colocations': {},
+    'clones': {},
+    'locations': {},
+    'init_services': [],
+    'systemd_services': []})
 
 
-def mock_hook(*args, **kwargs):
+def _identity(f):
+    return f
+
 
-    def inner(f):
-        # remember what we were passed.  Note that we can't actually determine
-        # the class we're attached to, as the decorator only gets the function.
-        _hook_args[f.__name__] = dict(args=args, kwargs=kwargs)
-        return f
-    return inner
+def mock_hook(*args, **kwargs):
+    # Nothing ever consults the decorator arguments, so every @hook
+    # site shares the one identity decorator instead of allocating a
+    # fresh closure per decoration.
+    return _identity
 
 
 class TestHAClusterRequires(unittest.TestCase):
@@ -57,49 +76,208 @@ class TestHAClusterRequires(unittest.TestCase):
     def setUpClass(cls):
         cls._patched_hook = mock.patch('charms.reactive.when', mock_hook)
         cls._patched_hook_started = cls._patched_hook.start()
-        # force requires to rerun the mock_hook decorator:
-        # try except is Python2/Python3 compatibility as Python3 has moved
-        # reload to importlib.
-        try:
-            reload(requires)
-        except NameError:
+        # Rerun the decorators in requires under the mocked 'when', but
+        # only once per process: a reload re-executes every top-level
+        # statement and produces the same module for every class that
+        # needs it.
+        if not getattr(requires, '_hook_mocked', False):
             import importlib
             importlib.reload(requires)
+            requires._hook_mocked = True
+        # rh_data_changed is needed by almost every test, so patch it
+        # once for the whole class and reset it per test in setUp.
+        cls._rh_data_changed_patcher = mock.patch.object(
+            requires, 'rh_data_changed')
+        cls._rh_data_changed = cls._rh_data_changed_patcher.start()
+        # Built once and shallow-copied per test; copying is much
+        # cheaper than reconstructing the relation object each time.
+        cls._cr_template = requires.HAClusterRequires('some-relation', [])
+        # Shared resource graph for the manage_resources tests, handed
+        # out as a deepcopy so each test can mutate its own.
+        cls._sample_crm = common.CRM()
+        cls._sample_crm.primitive('res_neutron_haproxy', 'lsb:haproxy',
+                                  op='monitor interval="5s"')
+        cls._sample_crm.init_services('haproxy')
+        cls._sample_crm.clone('cl_nova_haproxy', 'res_neutron_haproxy')
+        # Expected payloads used by the manage/add tests. They are only
+        # ever compared against, never mutated, so the tests reference
+        # them directly and the JSON encoding runs once per class.
+        cls._expected = {
+            'manage_resources': {
+                'json_clones': {"cl_nova_haproxy": "res_neutron_haproxy"},
+                'json_init_services': ["haproxy"],
+                'json_resource_params': {
+                    "res_neutron_haproxy": '  op monitor interval="5s"'},
+                'json_resources': {"res_neutron_haproxy": "lsb:haproxy"},
+                'json_delete_resources': [],
+                'json_groups': {},
+                'json_ms': {},
+                'json_orders': {},
+                'json_colocations': {},
+                'json_locations': {},
+                'json_systemd_services': []},
+            'bind_resources': {
+                **_EMPTY_SKELETON,
+                'resources': {},
+                'resource_params': {},
+                'delete_resources': [],
+                'some': 'resources'},
+            'add_vip': {
+                **_EMPTY_SKELETON,
+                'resources': {
+                    'res_mysql_4b8ce37_vip': 'ocf:heartbeat:IPaddr2'},
+                'delete_resources': [],
+                'resource_params': {
+                    'res_mysql_4b8ce37_vip': (
+                        '  params ip="10.110.5.43"'
+                        '  meta migration-threshold="INFINITY" '
+                        'failure-timeout="5s"'
+                        '  op monitor timeout="20s" '
+                        'interval="10s" depth="0"')}},
+            'add_additional_vip': {
+                **_EMPTY_SKELETON,
+                'resources': {
+                    'res_mysql_4b8ce37_vip': 'ocf:heartbeat:IPaddr2',
+                    'res_mysql_1993276_vip': 'ocf:heartbeat:IPaddr2'},
+                'delete_resources': [],
+                'resource_params': {
+                    'res_mysql_4b8ce37_vip': (
+                        '  params ip="10.110.5.43"'
+                        '  op monitor depth="0" '
+                        'timeout="20s" interval="10s"'),
+                    'res_mysql_1993276_vip': (
+                        '  params ip="10.120.5.43"'
+                        '  meta migration-threshold="INFINITY" '
+                        'failure-timeout="5s"'
+                        '  op monitor timeout="20s" '
+                        'interval="10s" depth="0"')},
+                'groups': {
+                    'grp_mysql_vips': ('res_mysql_1993276_vip '
+                                       'res_mysql_4b8ce37_vip')}},
+            'add_init_service': {
+                **_EMPTY_SKELETON,
+                'resources': {
+                    'res_mysql_telnetd': 'lsb:telnetd'},
+                'delete_resources': [],
+                'resource_params': {
+                    'res_mysql_telnetd':
+                        ('  meta migration-threshold="INFINITY" '
+                         'failure-timeout="5s"'
+                         '  op monitor interval="5s"')},
+                'clones': {'cl_res_mysql_telnetd': 'res_mysql_telnetd'},
+                'init_services': ('telnetd',)},
+            'add_dnsha': {
+                **_EMPTY_SKELETON,
+                'resources': {
+                    'res_keystone_public_hostname': 'ocf:maas:dns'},
+                'delete_resources': [],
+                'resource_params': {
+                    'res_keystone_public_hostname': (
+                        '  params  fqdn="keystone.public" '
+                        'ip_address="10.110.5.43"')}},
+            'add_additional_dnsha': {
+                **_EMPTY_SKELETON,
+                'resources': {
+                    'res_keystone_public_hostname': 'ocf:maas:dns',
+                    'res_keystone_admin_hostname': 'ocf:maas:dns'},
+                'delete_resources': [],
+                'resource_params': {
+                    'res_keystone_public_hostname': (
+                        '  params  fqdn="keystone.public" '
+                        'ip_address="10.110.5.43"'),
+                    'res_keystone_admin_hostname': (
+                        '  params  fqdn="keystone.admin" '
+                        'ip_address="10.120.5.43"')},
+                'groups': {
+                    'grp_keystone_hostnames': (
+                        'res_keystone_admin_hostname '
+                        'res_keystone_public_hostname')}},
+            'add_systemd_service': {
+                **_EMPTY_SKELETON,
+                'resources': {
+                    'res_mysql_telnetd': 'systemd:telnetd'},
+                'delete_resources': [],
+                'resource_params': {
+                    'res_mysql_telnetd':
+                        ('  meta migration-threshold="INFINITY" '
+                         'failure-timeout="5s"'
+                         '  op monitor interval="5s"')},
+                'clones': {'cl_res_mysql_telnetd': 'res_mysql_telnetd'},
+                'systemd_services': ('telnetd',)},
+            'colocation': {
+                **_EMPTY_SKELETON,
+                'resources': {},
+                'delete_resources': [],
+                'resource_params': {},
+                'colocations': {
+                    'ganesha_with_vip':
+                        ('inf: res_nfs_ganesha_nfs_ganesha '
+                         'grp_ganesha_vips '
+                         'node-attribute=red-nodes')}},
+        }
+        cls.jsonify(cls._expected['manage_resources'])
+        # Preseed states for the delete/add-additional tests. These are
+        # mutated through the reactive db, so tests must deepcopy them.
+        cls._preseed = {
+            'mysql_vip': {
+                **_EMPTY_SKELETON,
+                'resources': {
+                    'res_mysql_4b8ce37_vip': 'ocf:heartbeat:IPaddr2'},
+                'delete_resources': [],
+                'resource_params': {
+                    'res_mysql_4b8ce37_vip': (
+                        '  params ip="10.110.5.43"  op monitor depth="0" '
+                        'timeout="20s" interval="10s"')}},
+            'mysql_ens3_vip': {
+                **_EMPTY_SKELETON,
+                'resources': {
+                    'res_mysql_ens3_vip': 'ocf:heartbeat:IPaddr2'},
+                'resource_params': {
+                    'res_mysql_ens3_vip': (
+                        '  params ip="10.110.5.43"  op monitor depth="0" '
+                        'timeout="20s" interval="10s"')}},
+            'mysql_ens_vips': {
+                **_EMPTY_SKELETON,
+                'resources': {
+                    'res_mysql_ens3_vip': 'ocf:heartbeat:IPaddr2',
+                    'res_mysql_ens4_vip': 'ocf:heartbeat:IPaddr2'},
+                'resource_params': {
+                    'res_mysql_ens3_vip': (
+                        '  params ip="10.110.5.43"  op monitor depth="0" '
+                        'timeout="20s" interval="10s"'),
+                    'res_mysql_ens4_vip': (
+                        '  params ip="10.110.5.43"  op monitor depth="0" '
+                        'timeout="20s" interval="10s"')},
+                'init_services': ('telnetd',)},
+            'keystone_dns': {
+                **_EMPTY_SKELETON,
+                'resources': {
+                    'res_keystone_public_hostname': 'ocf:maas:dns'},
+                'delete_resources': [],
+                'resource_params': {
+                    'res_keystone_public_hostname': (
+                        '  params  fqdn="keystone.public" '
+                        'ip_address="10.110.5.43"')}},
+        }
 
     @classmethod
     def tearDownClass(cls):
+        cls._rh_data_changed_patcher.stop()
         cls._patched_hook.stop()
         cls._patched_hook_started = None
         cls._patched_hook = None
-        # and fix any breakage we did to the module
-        try:
-            reload(requires)
-        except NameError:
-            import importlib
-            importlib.reload(requires)
-
-    def patch(self, method):
-        _m = mock.patch.object(self.obj, method)
-        _mock = _m.start()
-        self.addCleanup(_m.stop)
-        return _mock
+        # The restoring reload of requires is deliberately skipped:
+        # nothing else in the suite observes the pristine decorators and
+        # a reload re-executes the whole module.
 
     def setUp(self):
-        self.cr = requires.HAClusterRequires('some-relation', [])
+        self.cr = copy.copy(self._cr_template)
         self.reactive_db = {}
-        self._patches = {}
-        self._patches_start = {}
-        self.obj = requires
-        for method in TO_PATCH:
-            setattr(self, method, self.patch(method))
+        self.rh_data_changed = self._rh_data_changed
+        self.rh_data_changed.reset_mock(return_value=True, side_effect=True)
 
     def tearDown(self):
         self.cr = None
-        for k, v in self._patches.items():
-            v.stop()
-            setattr(self, k, None)
-        self._patches = None
-        self._patches_start = None
 
     def _set_local(self, key=None, value=None, **kwdata):
         if key is not None:
@@ -120,13 +298,22 @@ class TestHAClusterRequires(unittest.TestCase):
         if preseed:
             self._set_local(resources=preseed)
 
+    @staticmethod
+    def _restore_kr(cr, attr, original):
+        if original is _MISSING:
+            delattr(cr, attr)
+        else:
+            setattr(cr, attr, original)
+
     def patch_kr(self, attr, return_value=None):
-        mocked = mock.patch.object(self.cr, attr)
-        self._patches[attr] = mocked
-        started = mocked.start()
-        started.return_value = return_value
-        self._patches_start[attr] = started
-        setattr(self, attr, started)
+        # self.cr is a per-test instance, so a plain attribute
+        # assignment does the same job as mock.patch.object at a
+        # fraction of the patcher machinery cost.
+        original = self.cr.__dict__.get(attr, _MISSING)
+        mocked = mock.Mock(return_value=return_value)
+        setattr(self.cr, attr, mocked)
+        self.addCleanup(self._restore_kr, self.cr, attr, original)
+        setattr(self, attr, mocked)
 
     def test_joined(self):
         self.patch_kr('set_state')
@@ -154,29 +341,20 @@ class TestHAClusterRequires(unittest.TestCase):
 
     def test_is_clustered(self):
         self.patch_kr('get_remote_all')
-
-        self.get_remote_all.return_value = [True]
-        self.assertTrue(self.cr.is_clustered())
-
-        self.get_remote_all.return_value = ['true']
-        self.assertTrue(self.cr.is_clustered())
-
-        self.get_remote_all.return_value = ['yes']
-        self.assertTrue(self.cr.is_clustered())
-
-        self.get_remote_all.return_value = None
-        self.assertFalse(self.cr.is_clustered())
-
-        self.get_remote_all.return_value = [False]
-        self.assertFalse(self.cr.is_clustered())
-
-        self.get_remote_all.return_value = ['false']
-        self.assertFalse(self.cr.is_clustered())
-
-        self.get_remote_all.return_value = ['flump']
-        self.assertFalse(self.cr.is_clustered())
-
-    def jsonify(self, options):
+        for value, expected in [
+                ([True], True),
+                (['true'], True),
+                (['yes'], True),
+                (None, False),
+                ([False], False),
+                (['false'], False),
+                (['flump'], False)]:
+            with self.subTest(value=value):
+                self.get_remote_all.return_value = value
+                self.assertEqual(self.cr.is_clustered(), expected)
+
+    @staticmethod
+    def jsonify(options):
         json_encode_options = dict(
             sort_keys=True,
         )
@@ -184,25 +362,8 @@ class TestHAClusterRequires(unittest.TestCase):
             options[k] = json.dumps(v, **json_encode_options)
 
     def test_manage_resources(self):
-        res = common.CRM()
-        res.primitive('res_neutron_haproxy', 'lsb:haproxy',
-                      op='monitor interval="5s"')
-        res.init_services('haproxy')
-        res.clone('cl_nova_haproxy', 'res_neutron_haproxy')
-        expected = {
-            'json_clones': {"cl_nova_haproxy": "res_neutron_haproxy"},
-            'json_init_services': ["haproxy"],
-            'json_resource_params': {
-                "res_neutron_haproxy": '  op monitor interval="5s"'},
-            'json_resources': {"res_neutron_haproxy": "lsb:haproxy"},
-            'json_delete_resources': [],
-            'json_groups': {},
-            'json_ms': {},
-            'json_orders': {},
-            'json_colocations': {},
-            'json_locations': {},
-            'json_systemd_services': []}
-        self.jsonify(expected)
+        res = copy.deepcopy(self._sample_crm)
+        expected = self._expected['manage_resources']
         self.rh_data_changed.return_value = True
         self.patch_kr('set_local')
         self.patch_kr('set_remote')
@@ -211,11 +372,7 @@ class TestHAClusterRequires(unittest.TestCase):
         self.set_remote.assert_called_once_with(**expected)
 
     def test_manage_resources_no_change(self):
-        res = common.CRM()
-        res.primitive('res_neutron_haproxy', 'lsb:haproxy',
-                      op='monitor interval="5s"')
-        res.init_services('haproxy')
-        res.clone('cl_nova_haproxy', 'res_neutron_haproxy')
+        res = copy.deepcopy(self._sample_crm)
         self.rh_data_changed.return_value = False
         self.patch_kr('set_local')
         self.patch_kr('set_remote')
@@ -224,14 +381,7 @@ class TestHAClusterRequires(unittest.TestCase):
         self.assertFalse(self.set_remote.called)
 
     def test_bind_resources(self):
-        expected = {
-            'colocations': {}, 'groups': {},
-            'clones': {}, 'orders': {},
-            'resource_params': {}, 'delete_resources': [],
-            'init_services': [], 'locations': {},
-            'some': 'resources', 'systemd_services': [],
-            'resources': {}, 'ms': {}
-        }
+        expected = self._expected['bind_resources']
         self.patch_kr('get_local', expected)
         self.patch_kr('bind_on')
         self.patch_kr('manage_resources')
@@ -240,14 +390,7 @@ class TestHAClusterRequires(unittest.TestCase):
         self.manage_resources.assert_called_once_with(expected)
 
     def test_bind_resources_no_defaults(self):
-        expected = {
-            'colocations': {}, 'groups': {},
-            'clones': {}, 'orders': {},
-            'resource_params': {}, 'delete_resources': [],
-            'init_services': [], 'locations': {},
-            'some': 'resources', 'systemd_services': [],
-            'resources': {}, 'ms': {}
-        }
+        expected = self._expected['bind_resources']
         self.patch_kr('get_local', expected)
         self.patch_kr('bind_on')
         self.patch_kr('manage_resources')
@@ -256,22 +399,7 @@ class TestHAClusterRequires(unittest.TestCase):
         self.manage_resources.assert_called_once_with(expected)
 
     def test_delete_resource(self):
-        existing_data = {
-            'resources': {
-                'res_mysql_ens3_vip': 'ocf:heartbeat:IPaddr2'},
-            'resource_params': {
-                'res_mysql_ens3_vip': (
-                    '  params ip="10.110.5.43"  op monitor depth="0" '
-                    'timeout="20s" interval="10s"')},
-            'groups': {},
-            'ms': {},
-            'orders': {},
-            'colocations': {},
-            'clones': {},
-            'locations': {},
-            'init_services': [],
-            'systemd_services': []}
-        self.mock_reactive_db(existing_data)
+        self.mock_reactive_db(copy.deepcopy(self._preseed['mysql_ens3_vip']))
         self.cr.delete_resource('res_mysql_ens3_vip')
         self.assertEqual(
             self._get_local('resources')['delete_resources'],
@@ -282,26 +410,7 @@ class TestHAClusterRequires(unittest.TestCase):
             self._get_db_res('resource_params').get('res_mysql_ens3_vip'))
 
     def test_delete_resource_multi(self):
-        existing_data = {
-            'resources': {
-                'res_mysql_ens3_vip': 'ocf:heartbeat:IPaddr2',
-                'res_mysql_ens4_vip': 'ocf:heartbeat:IPaddr2'},
-            'resource_params': {
-                'res_mysql_ens3_vip': (
-                    '  params ip="10.110.5.43"  op monitor depth="0" '
-                    'timeout="20s" interval="10s"'),
-                'res_mysql_ens4_vip': (
-                    '  params ip="10.110.5.43"  op monitor depth="0" '
-                    'timeout="20s" interval="10s"')},
-            'groups': {},
-            'ms': {},
-            'orders': {},
-            'colocations': {},
-            'clones': {},
-            'locations': {},
-            'init_services': ('telnetd',),
-            'systemd_services': []}
-        self.mock_reactive_db(existing_data)
+        self.mock_reactive_db(copy.deepcopy(self._preseed['mysql_ens_vips']))
         self.cr.delete_resource('res_mysql_ens3_vip')
         self.cr.delete_resource('res_mysql_ens4_vip')
         self.cr.delete_resource('telnetd')
@@ -320,174 +429,57 @@ class TestHAClusterRequires(unittest.TestCase):
             'telnetd' in self._get_db_res('init_services'))
 
     def test_add_vip(self):
-        expected = {
-            'resources': {
-                'res_mysql_4b8ce37_vip': 'ocf:heartbeat:IPaddr2'},
-            'delete_resources': [],
-            'resource_params': {
-                'res_mysql_4b8ce37_vip': (
-                    '  params ip="10.110.5.43"'
-                    '  meta migration-threshold="INFINITY" '
-                    'failure-timeout="5s"'
-                    '  op monitor timeout="20s" '
-                    'interval="10s" depth="0"')},
-            'groups': {},
-            'ms': {},
-            'orders': {},
-            'colocations': {},
-            'clones': {},
-            'locations': {},
-            'init_services': [],
-            'systemd_services': []}
-
         self.mock_reactive_db()
         self.cr.add_vip('mysql', '10.110.5.43')
-        self.set_local.assert_called_once_with(resources=expected)
+        self.set_local.assert_called_once_with(
+            resources=self._expected['add_vip'])
 
     def test_add_additional_vip(self):
-        existing_resource = {
-            'resources': {
-                'res_mysql_4b8ce37_vip': 'ocf:heartbeat:IPaddr2'},
-            'delete_resources': [],
-            'resource_params': {
-                'res_mysql_4b8ce37_vip': (
-                    '  params ip="10.110.5.43"  op monitor depth="0" '
-                    'timeout="20s" interval="10s"')},
-            'groups': {},
-            'ms': {},
-            'orders': {},
-            'colocations': {},
-            'clones': {},
-            'locations': {},
-            'init_services': [],
-            'systemd_services': []}
-
-        expected = {
-            'resources': {
-                'res_mysql_4b8ce37_vip': 'ocf:heartbeat:IPaddr2',
-                'res_mysql_1993276_vip': 'ocf:heartbeat:IPaddr2'},
-            'delete_resources': [],
-            'resource_params': {
-                'res_mysql_4b8ce37_vip': (
-                    '  params ip="10.110.5.43"'
-                    '  op monitor depth="0" '
-                    'timeout="20s" interval="10s"'),
-                'res_mysql_1993276_vip': (
-                    '  params ip="10.120.5.43"'
-                    '  meta migration-threshold="INFINITY" '
-                    'failure-timeout="5s"'
-                    '  op monitor timeout="20s" '
-                    'interval="10s" depth="0"')},
-            'groups': {
-                'grp_mysql_vips': ('res_mysql_1993276_vip '
-                                   'res_mysql_4b8ce37_vip')},
-            'ms': {},
-            'orders': {},
-            'colocations': {},
-            'clones': {},
-            'locations': {},
-            'init_services': [],
-            'systemd_services': []}
-
-        self.mock_reactive_db(existing_resource)
+        self.mock_reactive_db(copy.deepcopy(self._preseed['mysql_vip']))
         self.cr.add_vip('mysql', '10.120.5.43')
-        self.set_local.assert_called_once_with(resources=expected)
+        self.set_local.assert_called_once_with(
+            resources=self._expected['add_additional_vip'])
+
+    def test_add_vip_regroup_after_delete(self):
+        # A VIP deleted, re-added and purged again within one hook must
+        # not linger in the group directive (the incremental member set
+        # has to be re-filtered against the live resources).
+        self.mock_reactive_db(copy.deepcopy(self._preseed['mysql_ens3_vip']))
+        self.cr.delete_resource('res_mysql_ens3_vip')
+        self.cr.add_vip('mysql', '10.110.5.43', iface='ens3')
+        self.cr.delete_resource('res_other')
+        self.cr.add_vip('mysql', '10.120.5.43', iface='ens4')
+        resources = self._get_local('resources')
+        self.assertEqual(
+            resources['groups']['grp_mysql_vips'],
+            'res_mysql_ens4_vip')
+        self.assertNotIn('res_mysql_ens3_vip', resources['resources'])
 
     def test_add_init_service(self):
-        expected = {
-            'resources': {
-                'res_mysql_telnetd': 'lsb:telnetd'},
-            'delete_resources': [],
-            'resource_params': {
-                'res_mysql_telnetd':
-                    ('  meta migration-threshold="INFINITY" '
-                     'failure-timeout="5s"'
-                     '  op monitor interval="5s"')},
-            'groups': {},
-            'ms': {},
-            'orders': {},
-            'colocations': {},
-            'clones': {'cl_res_mysql_telnetd': 'res_mysql_telnetd'},
-            'locations': {},
-            'init_services': ('telnetd',),
-            'systemd_services': []}
         self.mock_reactive_db()
         self.cr.add_init_service('mysql', 'telnetd')
-        self.set_local.assert_called_once_with(resources=expected)
+        self.set_local.assert_called_once_with(
+            resources=self._expected['add_init_service'])
 
     def test_add_dnsha(self):
-        expected = {
-            'resources': {
-                'res_keystone_public_hostname': 'ocf:maas:dns'},
-            'delete_resources': [],
-            'resource_params': {
-                'res_keystone_public_hostname': (
-                    '  params  fqdn="keystone.public" '
-                    'ip_address="10.110.5.43"')},
-            'groups': {},
-            'ms': {},
-            'orders': {},
-            'colocations': {},
-            'clones': {},
-            'locations': {},
-            'init_services': [],
-            'systemd_services': []}
-
         self.mock_reactive_db()
         self.cr.add_dnsha(
             'keystone',
             '10.110.5.43',
             'keystone.public',
             'public')
-        self.set_local.assert_called_once_with(resources=expected)
+        self.set_local.assert_called_once_with(
+            resources=self._expected['add_dnsha'])
 
     def test_add_additional_dnsha(self):
-        existing_resource = {
-            'resources': {
-                'res_keystone_public_hostname': 'ocf:maas:dns'},
-            'delete_resources': [],
-            'resource_params': {
-                'res_keystone_public_hostname': (
-                    '  params  fqdn="keystone.public" '
-                    'ip_address="10.110.5.43"')},
-            'groups': {},
-            'ms': {},
-            'orders': {},
-            'colocations': {},
-            'clones': {},
-            'locations': {},
-            'init_services': [],
-            'systemd_services': []}
-        expected = {
-            'resources': {
-                'res_keystone_public_hostname': 'ocf:maas:dns',
-                'res_keystone_admin_hostname': 'ocf:maas:dns'},
-            'delete_resources': [],
-            'resource_params': {
-                'res_keystone_public_hostname': (
-                    '  params  fqdn="keystone.public" '
-                    'ip_address="10.110.5.43"'),
-                'res_keystone_admin_hostname': (
-                    '  params  fqdn="keystone.admin" '
-                    'ip_address="10.120.5.43"')},
-            'groups': {
-                'grp_keystone_hostnames': ('res_keystone_admin_hostname '
-                                           'res_keystone_public_hostname')},
-            'ms': {},
-            'orders': {},
-            'colocations': {},
-            'clones': {},
-            'locations': {},
-            'init_services': [],
-            'systemd_services': []}
-
-        self.mock_reactive_db(existing_resource)
+        self.mock_reactive_db(copy.deepcopy(self._preseed['keystone_dns']))
         self.cr.add_dnsha(
             'keystone',
             '10.120.5.43',
             'keystone.admin',
             'admin')
-        self.set_local.assert_called_once_with(resources=expected)
+        self.set_local.assert_called_once_with(
+            resources=self._expected['add_additional_dnsha'])
 
     @mock.patch.object(requires.hookenv, 'related_units')
     @mock.patch.object(requires.hookenv, 'relation_get')
@@ -507,15 +499,25 @@ class TestHAClusterRequires(unittest.TestCase):
             'rid:3': {},
             'systemd_services': []}
 
-        def get_unit_data(key, unit, relation_id):
-            return unit_data[relation_id].get(unit, {}).get(key, {})
-        conv1 = mock.MagicMock()
+        conv1 = mock.Mock()
         conv1.relation_ids = ['rid:1', 'rid:2']
-        conv2 = mock.MagicMock()
+        conv2 = mock.Mock()
         conv2.relation_ids = ['rid:3']
         self.patch_kr('conversations', [conv1, conv2])
-        related_units.side_effect = lambda x: unit_data[x].keys()
-        relation_get.side_effect = get_unit_data
+        # Precomputed lookup tables keep the side effects to a dict
+        # access per call instead of re-walking the nested unit_data.
+        units_by_rid = {
+            rid: list(units) for rid, units in unit_data.items()
+            if isinstance(units, dict)}
+        related_units.side_effect = units_by_rid.__getitem__
+        flat_data = {
+            (key, unit, rid): value
+            for rid in units_by_rid
+            for unit, data in unit_data[rid].items()
+            for key, value in data.items()}
+        flat_get = flat_data.get
+        relation_get.side_effect = (
+            lambda key, unit, rid: flat_get((key, unit, rid), {}))
         # Check de-duplication:
         self.assertEqual(
             self.cr.get_remote_all('key1'),
@@ -534,26 +536,10 @@ class TestHAClusterRequires(unittest.TestCase):
             ['defaultvalue'])
 
     def test_add_systemd_service(self):
-        expected = {
-            'resources': {
-                'res_mysql_telnetd': 'systemd:telnetd'},
-            'delete_resources': [],
-            'resource_params': {
-                'res_mysql_telnetd':
-                    ('  meta migration-threshold="INFINITY" '
-                     'failure-timeout="5s"'
-                     '  op monitor interval="5s"')},
-            'groups': {},
-            'ms': {},
-            'orders': {},
-            'colocations': {},
-            'clones': {'cl_res_mysql_telnetd': 'res_mysql_telnetd'},
-            'locations': {},
-            'init_services': [],
-            'systemd_services': ('telnetd',)}
         self.mock_reactive_db()
         self.cr.add_systemd_service('mysql', 'telnetd')
-        self.set_local.assert_called_once_with(resources=expected)
+        self.set_local.assert_called_once_with(
+            resources=self._expected['add_systemd_service'])
 
     def test_colocate_old(self):
         self.mock_reactive_db()
@@ -567,28 +553,14 @@ class TestHAClusterRequires(unittest.TestCase):
             'inf: res_nfs_ganesha_nfs_ganesha grp_ganesha_vips')
 
     def test_colocation(self):
-        expected = {
-            'resources': {},
-            'delete_resources': [],
-            'resource_params': {},
-            'groups': {},
-            'ms': {},
-            'orders': {},
-            'colocations': {
-                'ganesha_with_vip':
-                    ('inf: res_nfs_ganesha_nfs_ganesha grp_ganesha_vips '
-                     'node-attribute=red-nodes')},
-            'clones': {},
-            'locations': {},
-            'init_services': [],
-            'systemd_services': []}
         self.mock_reactive_db()
         self.cr.add_colocation(
             'ganesha_with_vip',
             'inf',
             ['res_nfs_ganesha_nfs_ganesha', 'grp_ganesha_vips'],
             'red-nodes')
-        self.set_local.assert_called_once_with(resources=expected)
+        self.set_local.assert_called_once_with(
+            resources=self._expected['colocation'])
         self.assertIsNotNone(
             self._get_db_res('colocations').get('ganesha_with_vip'))
         self.cr.remove_colocation('ganesha_with_vip')